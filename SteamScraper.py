@@ -8,10 +8,10 @@ Outputs JSON by default.
 """
 import argparse
 import json
-from typing import List
 
 from scraper.store_scraper import SteamStoreScraper
 from scraper.steamdb_scraper import SteamDBScraper
+from scraper.utils import dedupe_appids, read_appids_from_file
 
 
 def parse_args():
@@ -23,20 +23,6 @@ def parse_args():
     return p.parse_args()
 
 
-def read_appids_from_file(path: str) -> List[int]:
-    ids = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            s = line.strip()
-            if not s:
-                continue
-            try:
-                ids.append(int(s))
-            except ValueError:
-                continue
-    return ids
-
-
 def main():
     args = parse_args()
     appids = []
@@ -44,7 +30,7 @@ def main():
         appids.extend(args.appids)
     if args.from_file:
         appids.extend(read_appids_from_file(args.from_file))
-    appids = list(dict.fromkeys(appids))  # dedupe while preserving order
+    appids = dedupe_appids(appids)  # dedupe while preserving order
 
     if not appids:
         print("No appids provided. Use --appids or --from-file.")
@@ -72,7 +58,7 @@ def main():
         results.append(item)
 
     with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+        f.write(json.dumps(results, ensure_ascii=False, indent=2))
 
     print(f"Finished. Wrote {len(results)} entries to {args.out}")
 
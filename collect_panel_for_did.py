@@ -14,10 +14,12 @@ Notes:
 - Review counts per month may not be available; script will leave them as NaN if not found.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import os
+import csv
 import json
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 from patch_extractor import extract_patches_for_games
@@ -26,13 +28,30 @@ from scraper.store_scraper import SteamStoreScraper
 from scraper.steamdb_scraper import SteamDBScraper
 from scraper.reviews_scraper import fetch_app_reviews, read_api_key as read_api_key_reviews
 from scraper.cache import SteamCache
+from scraper.utils import worker_pool
+
+
+MAX_WORKERS = 8  # Games fetched concurrently; each scraper keeps its own rate limiter
+
+_NOCOMMA = str.maketrans('', '', ',')
 
 
 def read_appids_from_top_files() -> List[int]:
-    files = ['top100_topsellers_results.json', 'top100_results.json']
-    for fpath in files:
-        if os.path.exists(fpath):
-            with open(fpath, 'r', encoding='utf-8') as f:
+    for base in ('top100_topsellers_results', 'top100_results'):
+        # The top scrapers write a slim CSV summary next to each JSON; reading its appid
+        # column avoids materializing the full store/news payloads just to get the ids
+        csv_path = base + '.csv'
+        if os.path.exists(csv_path):
+            with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+                return [int(row['appid']) for row in csv.DictReader(f) if row.get('appid')]
+        # NDJSON (current scraper output): one row per line
+        if os.path.exists(base + '.jsonl'):
+            with open(base + '.jsonl', 'r', encoding='utf-8') as f:
+                data = [json.loads(line) for line in f if line.strip()]
+            return [int(x.get('appid')) for x in data if x.get('appid')]
+        # Older runs wrote a single JSON array
+        if os.path.exists(base + '.json'):
+            with open(base + '.json', 'r', encoding='utf-8') as f:
                 data = json.load(f)
             return [int(x.get('appid')) for x in data if x.get('appid')]
     return []
@@ -66,14 +85,48 @@ def owners_from_steamdb(steamdb_data: Dict) -> Optional[float]:
     try:
         parts = str(owners).split('-')
         if len(parts) == 2:
-            low = float(parts[0].replace(',', '').strip())
-            high = float(parts[1].replace(',', '').strip())
+            low = float(parts[0].translate(_NOCOMMA))
+            high = float(parts[1].translate(_NOCOMMA))
             return (low + high) / 2.0
     except Exception:
         return None
     return None
 
 
+def fetch_app_inputs(appid: int, store: SteamStoreScraper, steamdb: SteamDBScraper,
+                     api_key_reviews: Optional[str] = None) -> Tuple:
+    """Fetch (store_data, steamdb_data, review_data, monthly_series) for one game; failures become None."""
+    # Store metadata
+    try:
+        store_data = store.fetch_app(appid)
+    except Exception:
+        store_data = None
+    # SteamDB
+    try:
+        sdb = steamdb.fetch_app(appid)
+    except Exception:
+        sdb = None
+
+    # Review data
+    try:
+        review_data = fetch_app_reviews(appid, api_key=api_key_reviews)
+    except Exception:
+        review_data = None
+
+    # Monthly player series
+    series = fetch_monthly_series(appid)
+    return store_data, sdb, review_data, series
+
+
+def _datetime_strings(values: np.ndarray, unit: str) -> np.ndarray:
+    """Format datetime64 values as ISO strings truncated to `unit` ('D' -> YYYY-MM-DD,
+    'M' -> YYYY-MM); NaT becomes NaN like `Series.dt.strftime`."""
+    arr = values.astype(f'datetime64[{unit}]')
+    out = np.datetime_as_string(arr, unit=unit).astype(object)
+    out[np.isnat(arr)] = np.nan
+    return out
+
+
 def build_panel(appids: List[int], out_csv: str = 'did_panel.csv', use_cache: bool = True):
     cache = SteamCache() if use_cache else None
     store = SteamStoreScraper(cache=cache)
@@ -83,30 +136,19 @@ def build_panel(appids: List[int], out_csv: str = 'did_panel.csv', use_cache: bo
     api_key_reviews = read_api_key_reviews()
 
     # Extract patches for all apps via patch_extractor
-    patch_out = extract_patches_for_games(appids, out_json='patches_past_year_for_panel.json')
+    patch_out = extract_patches_for_games(appids, out_json='patches_past_year_for_panel.json', cache=cache)
     patch_summary = patch_out.get('summary', {})
 
-    rows = []
+    meta_rows = []
+    # Monthly series points for all games as flat columns (no per-game DataFrame)
+    series_cols = {'appid': [], 'date': [], 'avg': [], 'peak': []}
 
-    for appid in appids:
-        print(f"Processing app {appid}...")
-        # Store metadata
-        try:
-            store_data = store.fetch_app(appid)
-        except Exception:
-            store_data = None
-        # SteamDB
-        try:
-            sdb = steamdb.fetch_app(appid)
-        except Exception:
-            sdb = None
-        
-        # Review data
-        try:
-            review_data = fetch_app_reviews(appid, api_key=api_key_reviews)
-        except Exception:
-            review_data = None
+    # Network fetches per game are independent; fan them out, then assemble serially in input order
+    with worker_pool(MAX_WORKERS) as ex:
+        fetched = list(ex.map(lambda aid: fetch_app_inputs(aid, store, steamdb, api_key_reviews), appids))
 
+    for appid, (store_data, sdb, review_data, series) in zip(appids, fetched):
+        print(f"Processing app {appid}...")
         owners_est = owners_from_steamdb(sdb)
         metacritic = None
         if store_data:
@@ -118,109 +160,79 @@ def build_panel(appids: List[int], out_csv: str = 'did_panel.csv', use_cache: bo
             review_count = review_data.get('total_reviews')
             review_positive_pct = review_data.get('percent_positive')
 
-        # Last major patch date
+        # Last major patch date; games without one are controls (treatment=0)
         last_major = extract_last_major_date(patch_summary, appid)
         if last_major is None:
-            # No major patch -> still include control rows with event_date = NaT; treat as control
-            # We'll still attempt to fetch series and set treatment=0
             treatment = 0
-            event_dt = None
+            event_month = pd.NaT
         else:
             treatment = 1
-            event_dt = last_major
-
-        # Fetch monthly series
-        series = fetch_monthly_series(appid)
-        # Convert series to DataFrame keyed by YYYY-MM
-        df_series = pd.DataFrame(series)
-        if df_series.empty:
-            # create empty months with a consistent 'ym' column
-            df_series = pd.DataFrame(columns=['date', 'avg', 'peak', 'ym'])
-        else:
-            # normalize date to YYYY-MM and ensure 'ym' exists
-            df_series['date'] = pd.to_datetime(df_series['date'], errors='coerce')
-            try:
-                df_series['ym'] = df_series['date'].dt.to_period('M').dt.to_timestamp()
-            except Exception:
-                # fallback: create empty 'ym' column
-                df_series['ym'] = pd.NaT
-            try:
-                if 'ym' in df_series.columns:
-                    df_series = df_series.groupby('ym').agg({'avg':'mean','peak':'max'}).reset_index()
-                else:
-                    # keep as-is but ensure columns exist
-                    df_series = df_series.assign(ym=pd.NaT)
-            except Exception:
-                # If grouping fails, keep original structure with ym column
-                if 'ym' not in df_series.columns:
-                    df_series['ym'] = pd.NaT
-
-        # define event month
-        if event_dt is not None:
-            event_month = datetime(event_dt.year, event_dt.month, 1)
-        else:
-            event_month = None
-
-        # For months -4..+4
-        for rel in range(-4, 5):
-            if event_month is None:
-                # For control games, pick latest month available as reference and set rel months accordingly
-                if df_series.empty or ('ym' in df_series.columns and df_series['ym'].isna().all()):
-                    row_date = None
-                    avg = None
-                    peak = None
-                else:
-                    # If 'ym' column exists and is non-empty, use it; otherwise try to infer from 'date'
-                    if 'ym' in df_series.columns and not df_series['ym'].isna().all():
-                        latest = df_series['ym'].max()
-                        row_date = latest + pd.DateOffset(months=rel)
-                        matched = df_series[df_series['ym'] == row_date]
-                    else:
-                        # fallback: use 'date' column if present
-                        if 'date' in df_series.columns and not df_series['date'].isna().all():
-                            latest = pd.to_datetime(df_series['date']).max()
-                            # normalize to start of month
-                            latest_month = pd.Timestamp(year=latest.year, month=latest.month, day=1)
-                            row_date = latest_month + pd.DateOffset(months=rel)
-                            matched = df_series[pd.to_datetime(df_series['date']).dt.to_period('M').dt.to_timestamp() == row_date]
-                        else:
-                            row_date = None
-                            matched = pd.DataFrame()
-                    if not matched.empty:
-                        avg = float(matched['avg'].iloc[0])
-                        peak = float(matched['peak'].iloc[0])
-                    else:
-                        avg = None
-                        peak = None
-                event_date_str = None
-            else:
-                row_date = pd.Timestamp(event_month) + pd.DateOffset(months=rel)
-                # find matching month in series
-                matched = df_series[df_series['ym'] == row_date]
-                if not matched.empty:
-                    avg = float(matched['avg'].iloc[0])
-                    peak = float(matched['peak'].iloc[0])
-                else:
-                    avg = None
-                    peak = None
-                event_date_str = event_month.strftime('%Y-%m-%d')
-
-            rows.append({
-                'appid': appid,
-                'name': store_data.get('name') if store_data else None,
-                'event_date': event_date_str,
-                'rel_month': rel,
-                'month': row_date.strftime('%Y-%m') if row_date is not None else None,
-                'avg_players': avg,
-                'peak_players': peak,
-                'owners_estimate': owners_est,
-                'metacritic_score': metacritic,
-                'review_count': review_count,
-                'review_positive_pct': review_positive_pct,
-                'treatment': treatment
-            })
-
-    df_panel = pd.DataFrame(rows)
+            event_month = pd.Timestamp(last_major.year, last_major.month, 1)
+
+        meta_rows.append((
+            appid,
+            store_data.get('name') if store_data else None,
+            event_month,
+            owners_est,
+            metacritic,
+            review_count,
+            review_positive_pct,
+            treatment,
+        ))
+
+        series_cols['appid'].extend([appid] * len(series))
+        for point in series:
+            series_cols['date'].append(point.get('date'))
+            series_cols['avg'].append(point.get('avg'))
+            series_cols['peak'].append(point.get('peak'))
+
+    df_meta = pd.DataFrame.from_records(meta_rows, columns=[
+        'appid', 'name', 'event_month', 'owners_estimate', 'metacritic_score',
+        'review_count', 'review_positive_pct', 'treatment',
+    ]).drop_duplicates('appid')
+    df_meta['event_month'] = pd.to_datetime(df_meta['event_month'])
+
+    # One long-format frame of monthly averages for all games, keyed by (appid, ym)
+    if series_cols['appid']:
+        df_all = pd.DataFrame({
+            'appid': np.asarray(series_cols['appid'], dtype=np.int64),
+            'date': series_cols['date'],
+            'avg': np.asarray(series_cols['avg'], dtype=np.float64),
+            'peak': np.asarray(series_cols['peak'], dtype=np.float64),
+        })
+        # fetch_monthly_series emits ISO 'YYYY-MM-DD' dates: parse once with an explicit format,
+        # then floor to month start with numpy instead of a Period round-trip
+        dates = pd.to_datetime(df_all['date'], format='%Y-%m-%d', errors='coerce', cache=True)
+        df_all['ym'] = dates.values.astype('datetime64[M]').astype('datetime64[ns]')
+        df_all = df_all.groupby(['appid', 'ym'], as_index=False).agg(
+            avg_players=('avg', 'mean'), peak_players=('peak', 'max'))
+    else:
+        df_all = pd.DataFrame({
+            'appid': pd.Series(dtype='int64'),
+            'ym': pd.Series(dtype='datetime64[ns]'),
+            'avg_players': pd.Series(dtype='float64'),
+            'peak_players': pd.Series(dtype='float64'),
+        })
+
+    # Reference month: the event month for treated games, the latest observed month for controls
+    latest_month = df_all.groupby('appid')['ym'].max()
+    ref_by_appid = df_meta.set_index('appid')['event_month'].fillna(latest_month)
+
+    # (appid, rel_month) grid for months -4..+4, then one left join against the series
+    # built column-wise from numpy arrays (flat index = app_idx * 9 + rel + 4)
+    rel_months = np.arange(-4, 5, dtype=np.int64)
+    grid = pd.DataFrame({
+        'appid': np.repeat(np.asarray(appids, dtype=np.int64), len(rel_months)),
+        'rel_month': np.tile(rel_months, len(appids)),
+    })
+    ref = grid['appid'].map(ref_by_appid).values.astype('datetime64[M]')
+    grid['ym'] = (ref + grid['rel_month'].values.astype('timedelta64[M]')).astype('datetime64[ns]')
+    panel = grid.merge(df_meta, on='appid', how='left').merge(df_all, on=['appid', 'ym'], how='left')
+
+    panel['event_date'] = _datetime_strings(panel['event_month'].values, 'D')
+    panel['month'] = _datetime_strings(panel['ym'].values, 'M')
+    df_panel = panel[['appid', 'name', 'event_date', 'rel_month', 'month', 'avg_players', 'peak_players',
+                      'owners_estimate', 'metacritic_score', 'review_count', 'review_positive_pct', 'treatment']]
     df_panel.to_csv(out_csv, index=False)
     print(f"Wrote panel with {len(df_panel)} rows to {out_csv}")
     return df_panel
@@ -9,132 +9,148 @@ Notes:
 - "Owners" from SteamDB are best-effort text estimates; parsing may be noisy.
 - SteamDB may block automated requests (403). The script handles None/missing values.
 """
+import calendar
 from datetime import datetime, timedelta
+from functools import lru_cache
 import argparse
 import json
 import re
-import statistics
 from typing import List, Optional
 import csv
 
-import requests
+import numpy as np
+from scraper.cache import SteamCache
 from scraper.steamdb_scraper import SteamDBScraper
+from scraper.steam_api import fetch_current_players as fetch_player_count, fetch_news_for_app
+from scraper.utils import dedupe_appids, read_appids_from_file, worker_pool
 
 
-STEAM_PLAYERCOUNT_URL = "https://api.steampowered.com/ISteamUserStats/GetNumberOfCurrentPlayers/v1/"
+MAX_WORKERS = 8  # Appids checked concurrently; SteamDB stays behind its own rate limiter
 
+# Patch/update keyword patterns, compiled once into one alternation: a single scan per news item
+UPDATE_PATTERNS = (r"patch", r"update", r"hotfix", r"patch notes", r"update notes", r"version", r"v\.", r"beta")
+_UPDATE_RE = re.compile("|".join(UPDATE_PATTERNS))
 
-STEAM_NEWS_URL = "https://api.steampowered.com/ISteamNews/GetNewsForApp/v2/"
-
-
-def fetch_news_for_app(appid: int, count: int = 20) -> List[dict]:
-    params = {"appid": appid, "count": count, "maxlength": 1000}
-    resp = requests.get(STEAM_NEWS_URL, params=params, timeout=10, headers={"User-Agent": "steam-scraper/1.0"})
-    resp.raise_for_status()
-    data = resp.json()
-    return data.get("appnews", {}).get("newsitems", [])
+# Owners-string parsing helpers (numbers like 1,234 and en/em-dash ranges)
+_NUM_RE = re.compile(r"\d[\d,]*")
+_DASHES = str.maketrans({"–": "-", "—": "-"})
+_NOCOMMA = str.maketrans("", "", ",")
 
 
 def looks_like_update(item: dict) -> bool:
     # Heuristic: title or contents contain keywords indicating a patch/update
-    kws = [r"patch", r"update", r"hotfix", r"patch notes", r"update notes", r"version", r"v\.", r"beta"]
     txt = (item.get("title", "") + " " + item.get("contents", "")).lower()
-    for k in kws:
-        if re.search(k, txt):
-            return True
-    return False
+    return _UPDATE_RE.search(txt) is not None
+
+
+def update_cutoff_ts(months: int = 6) -> int:
+    """Unix seconds (UTC) of the start of the `months`-month lookback window."""
+    return calendar.timegm((datetime.utcnow() - timedelta(days=months * 30)).utctimetuple())
 
 
-def had_recent_update(appid: int, months: int = 6) -> bool:
+def had_recent_update(appid: int, months: int = 6, cache: Optional[SteamCache] = None,
+                      cutoff_ts: Optional[int] = None) -> bool:
     try:
-        items = fetch_news_for_app(appid)
+        items = fetch_news_for_app(appid, cache=cache)
     except Exception:
         # if news endpoint fails, assume unknown -> treat as not-updated
         return False
-    cutoff = datetime.utcnow() - timedelta(days=months * 30)
-    for it in items:
-        ts = it.get("date")
-        if not ts:
-            continue
-        dt = datetime.utcfromtimestamp(int(ts))
-        if dt >= cutoff:
-            # If heuristics match OR any news in timeframe, consider updated
-            if looks_like_update(it) or True:
-                return True
+    if cutoff_ts is None:
+        cutoff_ts = update_cutoff_ts(months)
+    # Steam returns news newest-first; sort defensively so we can stop at the first stale item
+    dated = sorted(((int(it.get("date") or 0), it) for it in items), key=lambda p: p[0], reverse=True)
+    for ts, it in dated:
+        if ts < cutoff_ts:
+            break  # also covers items without a date (ts == 0)
+        if looks_like_update(it):
+            return True
     return False
 
 
+@lru_cache(maxsize=4096)
 def parse_owners_value(s: Optional[str]) -> Optional[float]:
     if not s:
         return None
     # Normalize dash characters
-    s = s.replace("–", "-").replace("—", "-")
+    s = s.translate(_DASHES)
     # Find all numbers like 1,234 or 1234
-    nums = re.findall(r"[\d,]+", s)
+    nums = _NUM_RE.findall(s)
     if not nums:
         return None
-    values = [float(n.replace(",", "")) for n in nums]
+    values = [int(n.translate(_NOCOMMA)) for n in nums]
     if "-" in s and len(values) >= 2:
         # range -> return midpoint
         return (values[0] + values[1]) / 2.0
     # otherwise return the first number
-    return values[0]
+    return float(values[0])
 
 
 def fetch_current_players(appid: int) -> Optional[float]:
-    try:
-        resp = requests.get(STEAM_PLAYERCOUNT_URL, params={"appid": appid}, timeout=8, headers={"User-Agent": "steam-scraper/1.0"})
-        resp.raise_for_status()
-        data = resp.json()
-        pc = data.get("response", {}).get("player_count")
-        if pc is None:
-            return None
-        return float(pc)
-    except Exception:
+    pc = fetch_player_count(appid)
+    if pc is None:
         return None
+    return float(pc)
 
 
 def summarize_group(values: List[float]) -> dict:
     if not values:
         return {"count": 0, "mean": None, "median": None}
-    return {"count": len(values), "mean": statistics.mean(values), "median": statistics.median(values)}
+    arr = np.asarray(values, dtype=np.float64)
+    return {"count": int(arr.size), "mean": float(arr.mean()), "median": float(np.median(arr))}
+
+
+def check_app(aid: int, steamdb: SteamDBScraper, months: int = 6, cache: Optional[SteamCache] = None,
+              cutoff_ts: Optional[int] = None) -> dict:
+    """Run the news check and owners lookup for one appid and return its detail row."""
+    print(f"Checking {aid}...")
+    try:
+        is_updated = had_recent_update(aid, months=months, cache=cache, cutoff_ts=cutoff_ts)
+    except Exception as e:
+        print(f"  News check failed for {aid}: {e}")
+        is_updated = False
+
+    # fetch owners from SteamDB best-effort
+    try:
+        sdb = steamdb.fetch_app(aid)
+        owners_raw = sdb.get("owners") if sdb else None
+    except Exception as e:
+        print(f"  SteamDB fetch failed for {aid}: {e}")
+        owners_raw = None
+
+    try:
+        owners_val = parse_owners_value(owners_raw)
+    except ValueError as e:
+        # One malformed value (e.g. from an old cache entry) must not abort the batch
+        print(f"  Could not parse owners {owners_raw!r} for {aid}: {e}")
+        owners_val = None
+    # If owners unknown, fall back to current players as an install proxy
+    if owners_val is None:
+        pc = fetch_current_players(aid)
+        if pc is not None:
+            owners_val = pc
+            owners_raw = f"current_players:{int(pc)}"
+
+    return {"appid": aid, "updated_recently": is_updated, "owners_raw": owners_raw, "owners_value": owners_val}
 
 
 def compare(appids: List[int], months: int = 6, out: str = "compare_results.json", csv_path: Optional[str] = None):
-    store = SteamStoreScraper()
-    steamdb = SteamDBScraper()
+    cache = SteamCache()
+    steamdb = SteamDBScraper(cache=cache)
 
     updated = []
     not_updated = []
-    details = []
-
-    for aid in appids:
-        print(f"Checking {aid}...")
-        try:
-            is_updated = had_recent_update(aid, months=months)
-        except Exception as e:
-            print(f"  News check failed for {aid}: {e}")
-            is_updated = False
-
-        # fetch owners from SteamDB best-effort
-        try:
-            sdb = steamdb.fetch_app(aid)
-            owners_raw = sdb.get("owners") if sdb else None
-        except Exception as e:
-            print(f"  SteamDB fetch failed for {aid}: {e}")
-            owners_raw = None
 
-        owners_val = parse_owners_value(owners_raw)
-        # If owners unknown, fall back to current players as an install proxy
-        if owners_val is None:
-            pc = fetch_current_players(aid)
-            if pc is not None:
-                owners_val = pc
-                owners_raw = f"current_players:{int(pc)}"
-
-        entry = {"appid": aid, "updated_recently": is_updated, "owners_raw": owners_raw, "owners_value": owners_val}
-        details.append(entry)
-        if is_updated:
+    # One cutoff for the whole run, compared as integer unix seconds per news item
+    cutoff_ts = update_cutoff_ts(months)
+
+    # Per-appid checks are independent HTTP waits; run them concurrently, keep input order
+    with worker_pool(MAX_WORKERS) as ex:
+        details = list(ex.map(lambda aid: check_app(aid, steamdb, months=months, cache=cache, cutoff_ts=cutoff_ts),
+                              appids))
+
+    for entry in details:
+        owners_val = entry["owners_value"]
+        if entry["updated_recently"]:
             updated.append(owners_val) if owners_val is not None else None
         else:
             not_updated.append(owners_val) if owners_val is not None else None
@@ -148,15 +164,14 @@ def compare(appids: List[int], months: int = 6, out: str = "compare_results.json
 
     out_data = {"summary": summary, "details": details}
     with open(out, "w", encoding="utf-8") as f:
-        json.dump(out_data, f, indent=2, ensure_ascii=False)
+        f.write(json.dumps(out_data, indent=2, ensure_ascii=False))
 
     if csv_path:
         # write a simple CSV with rows for each app
         with open(csv_path, "w", newline="", encoding="utf-8") as cf:
             writer = csv.writer(cf)
             writer.writerow(["appid", "updated_recently", "owners_raw", "owners_value"])
-            for d in details:
-                writer.writerow([d.get("appid"), d.get("updated_recently"), d.get("owners_raw"), d.get("owners_value")])
+            writer.writerows([d["appid"], d["updated_recently"], d["owners_raw"], d["owners_value"]] for d in details)
 
     print("Comparison complete.")
     print(json.dumps(summary, indent=2))
@@ -172,20 +187,6 @@ def parse_args():
     return p.parse_args()
 
 
-def read_appids_from_file(path: str) -> List[int]:
-    ids = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            s = line.strip()
-            if not s:
-                continue
-            try:
-                ids.append(int(s))
-            except ValueError:
-                continue
-    return ids
-
-
 if __name__ == "__main__":
     args = parse_args()
     appids = []
@@ -193,7 +194,7 @@ if __name__ == "__main__":
         appids.extend(args.appids)
     if args.from_file:
         appids.extend(read_appids_from_file(args.from_file))
-    appids = list(dict.fromkeys(appids))
+    appids = dedupe_appids(appids)  # dedupe while preserving order
     if not appids:
         print("No appids provided.")
     else:
@@ -19,43 +19,51 @@ Minor patch indicators:
 import requests
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+import calendar
 import json
-import os
+import re
 
+import numpy as np
 
-STEAM_NEWS_URL = "https://api.steampowered.com/ISteamNews/GetNewsForApp/v2/"
-NEWS_FETCH_COUNT = 100  # Fetch more news to catch all patches
-
-
-def read_api_key(path: str = "APIkey.txt") -> Optional[str]:
-    """Read Steam API key from file if it exists."""
-    if not os.path.exists(path):
-        return None
-    with open(path, "r", encoding="utf-8") as f:
-        key = f.read().strip()
-        return key or None
+from scraper.cache import SteamCache
+from scraper.steam_api import fetch_news_for_app
+from scraper.utils import read_api_key, worker_pool
 
 
-def fetch_news_for_app(appid: int, api_key: Optional[str] = None, count: int = 100) -> List[Dict]:
-    """Fetch news items for an app from Steam Web API."""
-    params = {
-        "appid": appid,
-        "count": count,
-        "maxlength": 2000  # Allow longer content to analyze
-    }
-    if api_key:
-        params["key"] = api_key
-    
+NEWS_FETCH_COUNT = 100  # Fetch more news to catch all patches
+NEWS_MAXLENGTH = 2000  # Allow longer content to analyze
+MAX_WORKERS = 16  # Concurrent news requests; retries back off on 429/5xx
+
+# Keyword lists live at module scope as immutable tuples; each is compiled once into a
+# single alternation so classification is one regex scan per category
+PATCH_KEYWORDS = (
+    "patch", "update", "hotfix", "fix", "bug", "balance",
+    "expansion", "dlc", "content update", "new feature",
+    "maintenance", "adjustment", "tweak", "improvement",
+)
+MAJOR_INDICATORS = (
+    "major update", "major patch", "expansion", "new content",
+    "new feature", "new game mode", "new map", "new character",
+    "gameplay change", "mechanic change", "overhaul",
+    "substantial", "significant", "massive", "complete rework",
+)
+MINOR_INDICATORS = (
+    "hotfix", "bug fix", "small fix", "minor", "performance",
+    "cosmetic", "visual", "balance adjustment", "tweak",
+    "adjustment", "stability",
+)
+
+_PATCH_RE = re.compile("|".join(map(re.escape, PATCH_KEYWORDS)))
+_MAJOR_RE = re.compile("|".join(map(re.escape, MAJOR_INDICATORS)))
+_MINOR_RE = re.compile("|".join(map(re.escape, MINOR_INDICATORS)))
+
+
+def fetch_patch_news(appid: int, api_key: Optional[str] = None, cache: Optional[SteamCache] = None,
+                     session: Optional[requests.Session] = None) -> List[Dict]:
+    """Fetch news items to classify; returns an empty list on errors."""
     try:
-        resp = requests.get(
-            STEAM_NEWS_URL,
-            params=params,
-            timeout=10,
-            headers={"User-Agent": "steam-scraper/1.0"}
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        return data.get("appnews", {}).get("newsitems", [])
+        return fetch_news_for_app(appid, api_key=api_key, count=NEWS_FETCH_COUNT, maxlength=NEWS_MAXLENGTH,
+                                  cache=cache, session=session)
     except Exception as e:
         print(f"  Error fetching news for {appid}: {e}")
         return []
@@ -69,58 +77,30 @@ def classify_patch(title: str, contents: str) -> Optional[tuple]:
     combined = (title + " " + contents).lower()
     
     # Check if it's patch-related
-    patch_keywords = [
-        "patch", "update", "hotfix", "fix", "bug", "balance", 
-        "expansion", "dlc", "content update", "new feature",
-        "maintenance", "adjustment", "tweak", "improvement"
-    ]
-    is_patch = any(kw in combined for kw in patch_keywords)
-    
-    if not is_patch:
+    if not _PATCH_RE.search(combined):
         return None
     
     # Classify as MAJOR or MINOR
-    major_indicators = [
-        "major update", "major patch", "expansion", "new content",
-        "new feature", "new game mode", "new map", "new character",
-        "gameplay change", "mechanic change", "overhaul",
-        "substantial", "significant", "massive", "complete rework"
-    ]
-    
-    minor_indicators = [
-        "hotfix", "bug fix", "small fix", "minor", "performance",
-        "cosmetic", "visual", "balance adjustment", "tweak",
-        "adjustment", "stability"
-    ]
-    
-    is_major_candidate = any(ind in combined for ind in major_indicators)
-    is_minor_candidate = any(ind in combined for ind in minor_indicators)
-    
-    # Logic: if explicitly marked minor, it's minor
-    # if no indicators or only major indicators, it's major
-    # if only minor indicators, it's minor
-    if is_minor_candidate and not is_major_candidate:
-        is_major = False
-        reason = "minor_keywords"
-    elif is_major_candidate:
-        is_major = True
-        reason = "major_keywords"
-    else:
-        # Default: treat generic "update" as MAJOR (likely content-related)
-        # but "hotfix" and "bug fix" as MINOR
-        if "bug fix" in combined or "hotfix" in combined:
-            is_major = False
-            reason = "default_minor"
-        else:
-            is_major = True
-            reason = "default_major"
-    
-    return (True, is_major, reason)
-
-
-def extract_patches_for_games(appids: List[int], out_json: str = "patches_past_year.json") -> Dict:
+    # Logic: major indicators win whenever present; otherwise minor indicators make it minor;
+    # with no indicators at all it's major. The minor scan only runs when no major keyword hit.
+    if _MAJOR_RE.search(combined):
+        return (True, True, "major_keywords")
+    if _MINOR_RE.search(combined):
+        return (True, False, "minor_keywords")
+    # Default: treat generic "update" as MAJOR (likely content-related).
+    # "hotfix" and "bug fix" are minor indicators, so they never reach this branch.
+    return (True, True, "default_major")
+
+
+def extract_patches_for_games(appids: List[int], out_json: str = "patches_past_year.json",
+                              session: Optional[requests.Session] = None,
+                              cache: Optional[SteamCache] = None) -> Dict:
     """
     Extract patches for a list of game appids from the past year.
+
+    All appids share one pooled HTTP session (`session`, defaulting to the shared Steam API one)
+    and their news is fetched concurrently; classification then runs in input order.
+    Pass a `SteamCache` to reuse news fetched by earlier runs.
     
     Returns dict:
     {
@@ -150,76 +130,80 @@ def extract_patches_for_games(appids: List[int], out_json: str = "patches_past_y
     """
     api_key = read_api_key()
     one_year_ago = datetime.utcnow() - timedelta(days=365)
+    cutoff_ts = calendar.timegm(one_year_ago.utctimetuple())
     
     print(f"Extracting patches from {len(appids)} games (past year: since {one_year_ago.date()})")
     print(f"Using API key: {'present' if api_key else 'none'}\n")
     
     summary = {}
     all_patches = []
-    
-    for appid in appids:
-        print(f"Processing appid {appid}...")
-        
-        # Fetch news
-        news = fetch_news_for_app(appid, api_key=api_key, count=NEWS_FETCH_COUNT)
+
+    # Fetch news for all appids concurrently (pure I/O wait). Results are consumed lazily in
+    # input order, so each app's raw news can be garbage-collected once it has been classified.
+    with worker_pool(MAX_WORKERS) as ex:
+        news_iter = ex.map(
+            lambda aid: fetch_patch_news(aid, api_key=api_key, cache=cache, session=session),
+            appids,
+        )
+
+        for appid, news in zip(appids, news_iter):
+            print(f"Processing appid {appid}...")
         
-        patches = []
-        for item in news:
-            # Check timestamp
-            unix_ts = item.get("date", 0)
-            try:
-                item_date = datetime.utcfromtimestamp(unix_ts)
-            except Exception:
-                continue
-            
-            if item_date < one_year_ago:
-                continue  # Older than 1 year
+            patch_count = 0
+            major_count = 0
+            last_patch_date = None
+            first_major_patch_date = None
+            # Drop items older than 1 year with a plain int compare before any conversion or text work
+            recent = [item for item in news if (item.get("date") or 0) >= cutoff_ts]
+            # Format the surviving timestamps in one go
+            date_strs = np.datetime_as_string(
+                np.asarray([item["date"] for item in recent], dtype="datetime64[s]"), unit="s").tolist()
+            for item, date_iso in zip(recent, date_strs):
+                unix_ts = item["date"]
             
-            title = item.get("title", "")
-            contents = item.get("contents", "")
+                title = item.get("title", "")
+                contents = item.get("contents", "")
             
-            # Classify
-            classification = classify_patch(title, contents)
-            if not classification:
-                continue  # Not a patch
+                # Classify
+                classification = classify_patch(title, contents)
+                if not classification:
+                    continue  # Not a patch
             
-            is_patch, is_major, reason = classification
+                is_patch, is_major, reason = classification
             
-            patch_entry = {
-                "appid": appid,
-                "title": title,
-                "contents": contents[:500],  # Truncate for size
-                "date": item_date.strftime("%Y-%m-%d %H:%M:%S"),
-                "unix_timestamp": unix_ts,
-                "is_major": is_major,
-                "classification_reason": reason
-            }
-            patches.append(patch_entry)
-            all_patches.append(patch_entry)
+                patch_entry = {
+                    "appid": appid,
+                    "title": title,
+                    "contents": contents[:500],  # Truncate for size
+                    "date": date_iso.replace("T", " "),
+                    "unix_timestamp": unix_ts,
+                    "is_major": is_major,
+                    "classification_reason": reason
+                }
+                all_patches.append(patch_entry)
+                patch_count += 1
+
+                # Running summary stats (single pass over the news items)
+                date_str = patch_entry["date"]
+                if last_patch_date is None or date_str > last_patch_date:
+                    last_patch_date = date_str
+                if is_major:
+                    major_count += 1
+                    if first_major_patch_date is None or date_str < first_major_patch_date:
+                        first_major_patch_date = date_str
         
-        # Summarize
-        major_count = sum(1 for p in patches if p["is_major"])
-        minor_count = len(patches) - major_count
+            minor_count = patch_count - major_count
         
-        last_patch_date = None
-        first_major_patch_date = None
-        
-        if patches:
-            last_patch_date = max(p["date"] for p in patches)
-        if any(p["is_major"] for p in patches):
-            major_patches = [p for p in patches if p["is_major"]]
-            first_major_patch_date = min(p["date"] for p in major_patches)
-        
-        summary[appid] = {
-            "total_patches": len(patches),
-            "major_patches": major_count,
-            "minor_patches": minor_count,
-            "has_major_patch": major_count > 0,
-            "first_major_patch_date": first_major_patch_date,
-            "last_patch_date": last_patch_date
-        }
+            summary[appid] = {
+                "total_patches": patch_count,
+                "major_patches": major_count,
+                "minor_patches": minor_count,
+                "has_major_patch": major_count > 0,
+                "first_major_patch_date": first_major_patch_date,
+                "last_patch_date": last_patch_date
+            }
         
-        print(f"  -> {len(patches)} patches ({major_count} major, {minor_count} minor)")
+            print(f"  -> {patch_count} patches ({major_count} major, {minor_count} minor)")
     
     output = {
         "extraction_date": datetime.utcnow().isoformat(),
@@ -229,7 +213,7 @@ def extract_patches_for_games(appids: List[int], out_json: str = "patches_past_y
     }
     
     with open(out_json, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+        f.write(json.dumps(output, ensure_ascii=False, indent=2))
     
     print(f"\nWrote {len(all_patches)} patches to {out_json}")
     return output
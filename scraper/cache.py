@@ -1,72 +1,228 @@
 """SQLite caching layer for Steam API responses.
 
 Stores cache entries by endpoint and appid. Optional TTL (time-to-live) in seconds.
+The database runs in WAL mode on a single long-lived connection so concurrent
+lookups from worker threads can read while a write commits.
 """
 import sqlite3
 import json
+import threading
 import time
-from typing import Optional
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+
+_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-20000;
+    PRAGMA mmap_size=30000000000;
+    PRAGMA busy_timeout=5000;
+"""
+
+# Clustered on the composite key so a lookup is a single B-tree descent.
+_CREATE_SQL = """
+    CREATE TABLE {name} (
+        endpoint TEXT NOT NULL,
+        appid INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        timestamp REAL NOT NULL,
+        PRIMARY KEY (endpoint, appid)
+    ) WITHOUT ROWID
+"""
+
+# Kept as fixed strings so sqlite3's per-connection statement cache reuses
+# the prepared statements across calls.
+_GET_SQL = "SELECT data, timestamp FROM cache WHERE endpoint = ? AND appid = ? AND timestamp > ?"
+_SET_SQL = "INSERT OR REPLACE INTO cache (endpoint, appid, data, timestamp) VALUES (?, ?, ?, ?)"
+_PURGE_SQL = "DELETE FROM cache WHERE timestamp < ?"
+
+# Payloads above this size (e.g. store entries carrying release_raw) are
+# zlib-compressed and stored as BLOBs; smaller ones stay plain JSON text.
+COMPRESS_MIN_BYTES = 1024
+
+# Default entry lifetime. Automatic purges never use a shorter TTL, so a cache
+# opened with a short TTL (e.g. for players/news) cannot wipe rows that
+# default-TTL readers still consider fresh.
+DEFAULT_TTL_SECONDS = 604800
+
+
+def _encode(data):
+    raw = json.dumps(data, separators=(",", ":"))
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return raw
+    return zlib.compress(raw.encode("utf-8"), 6)  # bytes bind as a BLOB
+
+
+def _decode(value):
+    if isinstance(value, bytes):
+        value = zlib.decompress(value)
+    return json.loads(value)
 
 
 class SteamCache:
-    def __init__(self, db_path: str = "steam_cache.db", ttl_seconds: int = 604800):
-        """Initialize cache with optional TTL (default 7 days)."""
+    def __init__(self, db_path: str = "steam_cache.db", ttl_seconds: int = DEFAULT_TTL_SECONDS, cache_bytes: int = 8 << 20,
+                 gc_interval: float = 3600):
+        """Initialize cache with optional TTL (default 7 days).
+
+        Recently used entries are also kept in process in their encoded (and for
+        large payloads compressed) form, up to `cache_bytes` in total (0 disables
+        this). Every `get` decodes a fresh object, so callers may mutate results.
+        Expired rows are swept every `gc_interval` seconds by a daemon timer
+        (0 disables the timer; the sweep on open still runs).
+        """
         self.db_path = db_path
         self.ttl_seconds = ttl_seconds
+        self.cache_bytes = cache_bytes
+        # (endpoint, appid) -> (encoded payload, timestamp), least recently used first
+        self._mem = OrderedDict()
+        self._mem_used = 0
+        self._mem_lock = threading.Lock()
+        # Autocommit connection shared across threads; writes are serialized
+        # by the lock so there is only ever one writer.
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._write_lock = threading.Lock()
         self._init_db()
+        self.purge_expired()
+        self.gc_interval = gc_interval
+        self._gc_timer = None
+        self._schedule_gc()
 
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS cache (
-                    endpoint TEXT NOT NULL,
-                    appid INTEGER NOT NULL,
-                    data TEXT NOT NULL,
-                    timestamp REAL NOT NULL,
-                    PRIMARY KEY (endpoint, appid)
-                )
-            """)
-            conn.commit()
-
-    def get(self, endpoint: str, appid: int) -> Optional[dict]:
-        """Retrieve cached data if it exists and is not expired."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT data, timestamp FROM cache WHERE endpoint = ? AND appid = ?",
-                (endpoint, appid)
-            )
-            row = cursor.fetchone()
-            if not row:
-                return None
-            data_str, ts = row
-            # Check if expired
-            if time.time() - ts > self.ttl_seconds:
-                # Delete expired entry
-                conn.execute("DELETE FROM cache WHERE endpoint = ? AND appid = ?", (endpoint, appid))
-                conn.commit()
-                return None
-            return json.loads(data_str)
+        self._conn.executescript(_PRAGMAS)
+        with self._write_lock:
+            row = self._conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'cache'"
+            ).fetchone()
+            if row is None:
+                self._conn.execute(_CREATE_SQL.format(name="cache"))
+            elif "WITHOUT ROWID" not in row[0].upper():
+                # One-shot migration from the original rowid table
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.execute(_CREATE_SQL.format(name="cache_new"))
+                    self._conn.execute(
+                        "INSERT INTO cache_new (endpoint, appid, data, timestamp) "
+                        "SELECT endpoint, appid, data, timestamp FROM cache"
+                    )
+                    self._conn.execute("DROP TABLE cache")
+                    self._conn.execute("ALTER TABLE cache_new RENAME TO cache")
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ts ON cache(timestamp)")
+
+    def get(self, endpoint: str, appid: int, ttl_seconds: Optional[int] = None) -> Optional[dict]:
+        """Retrieve cached data if it exists and is not expired.
+
+        `ttl_seconds` overrides the cache-wide TTL for short-lived endpoints.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        key = (endpoint, appid)
+        min_ts = time.time() - ttl
+        with self._mem_lock:
+            hit = self._mem.get(key)
+            if hit is not None and hit[1] > min_ts:
+                self._mem.move_to_end(key)
+                return _decode(hit[0])
+        row = self._conn.execute(_GET_SQL, (endpoint, appid, min_ts)).fetchone()
+        if not row:
+            return None
+        self._remember(key, row[0], row[1])
+        return _decode(row[0])
+
+    def _remember(self, key: Tuple[str, int], payload, ts: float):
+        if self.cache_bytes <= 0:
+            return
+        size = len(payload)
+        with self._mem_lock:
+            old = self._mem.pop(key, None)
+            if old is not None:
+                self._mem_used -= len(old[0])
+            if size > self.cache_bytes:
+                return  # would evict everything else; leave it to SQLite
+            self._mem[key] = (payload, ts)
+            self._mem_used += size
+            while self._mem_used > self.cache_bytes:
+                _, (evicted, _) = self._mem.popitem(last=False)
+                self._mem_used -= len(evicted)
 
     def set(self, endpoint: str, appid: int, data: dict):
         """Store data in cache."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO cache (endpoint, appid, data, timestamp) VALUES (?, ?, ?, ?)",
-                (endpoint, appid, json.dumps(data), time.time())
-            )
-            conn.commit()
+        payload = _encode(data)
+        now = time.time()
+        with self._write_lock:
+            self._conn.execute(_SET_SQL, (endpoint, appid, payload, now))
+        self._remember((endpoint, appid), payload, now)
+
+    def set_many(self, entries: Iterable[Tuple[str, int, dict]]) -> int:
+        """Store several (endpoint, appid, data) entries in one transaction."""
+        now = time.time()
+        rows = [(endpoint, appid, _encode(data), now) for endpoint, appid, data in entries]
+        if not rows:
+            return 0
+        with self._write_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(_SET_SQL, rows)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        for endpoint, appid, payload, _ in rows:
+            self._remember((endpoint, appid), payload, now)
+        return len(rows)
+
+    def _schedule_gc(self):
+        if self.gc_interval <= 0:
+            return
+        self._gc_timer = threading.Timer(self.gc_interval, self._gc)
+        self._gc_timer.daemon = True
+        self._gc_timer.start()
+
+    def _gc(self):
+        try:
+            self.purge_expired()
+        except sqlite3.Error:
+            # Connection closed or database busy; try again next round
+            pass
+        self._schedule_gc()
+
+    def purge_expired(self, ttl_seconds: Optional[int] = None) -> int:
+        """Delete entries older than the TTL and return how many were removed.
+
+        Runs when the cache is opened and then periodically in the background;
+        `get` only skips expired rows and never writes. Without `ttl_seconds`,
+        the longer of this cache's TTL and `DEFAULT_TTL_SECONDS` is used, since
+        other readers of the same database may keep rows for the default TTL.
+        """
+        ttl = max(self.ttl_seconds, DEFAULT_TTL_SECONDS) if ttl_seconds is None else ttl_seconds
+        with self._write_lock:
+            cursor = self._conn.execute(_PURGE_SQL, (time.time() - ttl,))
+        return cursor.rowcount
 
     def clear(self):
         """Clear all cache entries."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM cache")
-            conn.commit()
+        with self._write_lock:
+            self._conn.execute("DELETE FROM cache")
+        with self._mem_lock:
+            self._mem.clear()
+            self._mem_used = 0
 
     def get_stats(self) -> dict:
         """Get cache statistics."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM cache")
-            count = cursor.fetchone()[0]
-            cursor = conn.execute("SELECT endpoint, COUNT(*) as cnt FROM cache GROUP BY endpoint")
-            by_endpoint = {row[0]: row[1] for row in cursor.fetchall()}
+        count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        cursor = self._conn.execute("SELECT endpoint, COUNT(*) as cnt FROM cache GROUP BY endpoint")
+        by_endpoint = {row[0]: row[1] for row in cursor.fetchall()}
         return {"total": count, "by_endpoint": by_endpoint}
+
+    def close(self):
+        """Stop the background sweep and close the underlying database connection."""
+        if self._gc_timer is not None:
+            self._gc_timer.cancel()
+            self._gc_timer = None
+        self.gc_interval = 0
+        self._conn.close()
@@ -9,22 +9,17 @@ Fallback: scrape Steam Store page for review summary if API fails.
 """
 
 from typing import Optional, Dict
-import requests
 from bs4 import BeautifulSoup
 import re
-import os
+import json
 
+from .utils import create_session, read_api_key
 
-STEAM_REVIEWS_API = "https://steamcommunity.com/api/GetAppReviews/v1"
 
+STEAM_REVIEWS_API = "https://steamcommunity.com/api/GetAppReviews/v1"
 
-def read_api_key(path: str = "APIkey.txt") -> Optional[str]:
-    """Read Steam API key from file if it exists."""
-    if not os.path.exists(path):
-        return None
-    with open(path, "r", encoding="utf-8") as f:
-        key = f.read().strip()
-        return key or None
+# Shared keep-alive session for the reviews endpoint (sized for threaded callers)
+_SESSION = create_session(pool_connections=4, pool_maxsize=32)
 
 
 def fetch_app_reviews(appid: int, api_key: Optional[str] = None, limit: int = 0) -> Optional[Dict]:
@@ -55,7 +50,7 @@ def fetch_app_reviews(appid: int, api_key: Optional[str] = None, limit: int = 0)
         params["key"] = api_key
     
     try:
-        resp = requests.get(
+        resp = _SESSION.get(
             STEAM_REVIEWS_API,
             params=params,
             timeout=10,
@@ -65,7 +60,7 @@ def fetch_app_reviews(appid: int, api_key: Optional[str] = None, limit: int = 0)
         
         # Try to parse JSON; if empty or invalid, return None
         try:
-            data = resp.json()
+            data = json.loads(resp.content)
         except Exception:
             # API returned invalid JSON (likely rate limited)
             return None
@@ -111,7 +106,7 @@ def fetch_app_reviews_recent(appid: int, api_key: Optional[str] = None, days: in
         params["key"] = api_key
     
     try:
-        resp = requests.get(
+        resp = _SESSION.get(
             STEAM_REVIEWS_API,
             params=params,
             timeout=10,
@@ -120,7 +115,7 @@ def fetch_app_reviews_recent(appid: int, api_key: Optional[str] = None, days: in
         resp.raise_for_status()
         
         try:
-            data = resp.json()
+            data = json.loads(resp.content)
         except Exception:
             # API returned invalid JSON
             return None
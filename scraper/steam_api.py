@@ -0,0 +1,71 @@
+"""Helpers for the official Steam Web API (api.steampowered.com).
+
+News items come from `ISteamNews/GetNewsForApp/v2` and live player counts from
+`ISteamUserStats/GetNumberOfCurrentPlayers/v1`; both go through one pooled session.
+Callers that pass a `SteamCache` get news cached for `NEWS_CACHE_TTL` seconds and
+player counts for `PLAYERS_CACHE_TTL`, so reruns of the top-N, compare, patch
+extraction and panel scripts skip the HTTP round-trip.
+"""
+import json
+from typing import List, Optional
+
+import requests
+
+from .cache import SteamCache
+from .utils import create_session
+
+
+STEAM_NEWS_URL = "https://api.steampowered.com/ISteamNews/GetNewsForApp/v2/"
+STEAM_PLAYERCOUNT_URL = "https://api.steampowered.com/ISteamUserStats/GetNumberOfCurrentPlayers/v1/"
+NEWS_CACHE_TTL = 3600  # news changes on the order of hours
+PLAYERS_CACHE_TTL = 60  # live player counts are only good for about a minute
+
+# Shared keep-alive session so every appid reuses the pooled connection
+_SESSION = create_session(status_forcelist=(429, 500, 502, 503, 504), pool_connections=4, pool_maxsize=32)
+_SESSION.headers["User-Agent"] = "steam-scraper/1.0"
+
+
+def fetch_news_for_app(appid: int, api_key: Optional[str] = None, count: int = 20, maxlength: int = 1000,
+                       cache: Optional[SteamCache] = None, session: Optional[requests.Session] = None) -> List[dict]:
+    """Fetch news items for an app. Raises on HTTP errors.
+
+    Cached entries are keyed by `news:<count>:<maxlength>` and the appid.
+    """
+    endpoint = f"news:{count}:{maxlength}"
+    if cache is not None:
+        cached = cache.get(endpoint, appid, ttl_seconds=NEWS_CACHE_TTL)
+        if cached is not None:
+            return cached
+
+    params = {"appid": appid, "count": count, "maxlength": maxlength}
+    if api_key:
+        params["key"] = api_key
+    resp = (session or _SESSION).get(STEAM_NEWS_URL, params=params, timeout=10)
+    resp.raise_for_status()
+    items = json.loads(resp.content).get("appnews", {}).get("newsitems", [])
+
+    if cache is not None:
+        cache.set(endpoint, appid, items)
+    return items
+
+
+def fetch_current_players(appid: int, session: Optional[requests.Session] = None,
+                          cache: Optional[SteamCache] = None) -> Optional[int]:
+    """Current player count for an app, or None if the request fails.
+
+    With a `cache`, counts are reused for `PLAYERS_CACHE_TTL` seconds.
+    """
+    if cache is not None:
+        cached = cache.get("players", appid, ttl_seconds=PLAYERS_CACHE_TTL)
+        if cached is not None:
+            return cached
+    try:
+        resp = (session or _SESSION).get(STEAM_PLAYERCOUNT_URL, params={"appid": appid}, timeout=8)
+        resp.raise_for_status()
+        count = json.loads(resp.content).get("response", {}).get("player_count")
+    except (requests.RequestException, ValueError, KeyError):
+        # Network/HTTP failures and malformed JSON; anything else is a bug and propagates
+        return None
+    if cache is not None and count is not None:
+        cache.set("players", appid, count)
+    return count
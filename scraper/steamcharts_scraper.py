@@ -10,14 +10,34 @@ Functions:
 Note: This is best-effort scraping. If SteamCharts blocks or changes layout, results may be incomplete.
 """
 from typing import List, Dict, Optional
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 import json
 from datetime import datetime
 
+import numpy as np
+
+from .utils import create_session
+
 HEADERS = {"User-Agent": "steam-scraper/1.0 (+https://github.com)"}
 
+# Shared keep-alive session, pooled for threaded callers
+_SESSION = create_session(pool_connections=4, pool_maxsize=32)
+_SESSION.headers.update(HEADERS)
+
+# Chart-data patterns, compiled once and reused for every page
+_RE_CHARTDATA = re.compile(r"chartData\s*=\s*(\[.+?\])\s*;", re.S)
+_RE_DATA = re.compile(r"data:\s*(\[\[.*?\]\])\s*\}", re.S)
+_RE_SETDATA = re.compile(r"setData\((\[.+?\])\)", re.S)
+_RE_TRAILING_COMMA = re.compile(r",\s*\]")
+_RE_JSON_ARR = re.compile(r"(\[\s*\[\s*\d+\s*,\s*\d+.*?\])", re.S)
+
+# Table cells: drop thousands separators, en-dash placeholders count as zero
+_NUM_TABLE = str.maketrans({",": None, "–": "0"})
+
+# The HTML fallback only reads tables, so parse nothing else
+_TABLES = SoupStrainer('table')
+
 
 def _parse_chartdata_json(text: str) -> Optional[List[Dict]]:
     """Try to extract a JavaScript JSON array that contains chart data.
@@ -25,19 +45,19 @@ def _parse_chartdata_json(text: str) -> Optional[List[Dict]]:
     Returns list of [timestamp_ms, avg, peak] or similar.
     """
     # Pattern: var chartData = ...; or chartData = [...];
-    m = re.search(r"chartData\s*=\s*(\[.+?\])\s*;", text, flags=re.S)
+    m = _RE_CHARTDATA.search(text)
     if not m:
         # Try another pattern: series: [{data: [...] }]
-        m = re.search(r"data:\s*(\[\[.*?\]\])\s*\}", text, flags=re.S)
+        m = _RE_DATA.search(text)
     if not m:
         # Try JSON-like assignment: g.setData( ... );
-        m = re.search(r"setData\((\[.+?\])\)", text, flags=re.S)
+        m = _RE_SETDATA.search(text)
     if not m:
         return None
     try:
         arr_text = m.group(1)
         # Clean up trailing commas
-        arr_text = re.sub(r",\s*\]", "]", arr_text)
+        arr_text = _RE_TRAILING_COMMA.sub("]", arr_text)
         data = json.loads(arr_text)
         # Data may be list of [ts, avg, peak] or dicts
         return data
@@ -45,6 +65,47 @@ def _parse_chartdata_json(text: str) -> Optional[List[Dict]]:
         return None
 
 
+def _chart_points_to_rows_slow(points: List) -> List[Dict]:
+    """Per-row conversion, used when the points do not form a numeric array."""
+    results = []
+    for item in points:
+        try:
+            ts = int(item[0])
+            # ts may be in milliseconds
+            if ts > 1e12:
+                # milliseconds
+                dt = datetime.utcfromtimestamp(ts / 1000.0)
+            else:
+                dt = datetime.utcfromtimestamp(ts)
+            avg = float(item[1]) if item[1] is not None else None
+            peak = float(item[2]) if item[2] is not None else None
+            results.append({"date": f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}", "avg": avg, "peak": peak})
+        except Exception:
+            continue
+    return results
+
+
+def _chart_points_to_rows(parsed: List) -> List[Dict]:
+    """Convert [ts, avg, peak] points to {date, avg, peak} dicts in one vectorized pass."""
+    points = [item[:3] for item in parsed if isinstance(item, (list, tuple)) and len(item) >= 3]
+    if not points:
+        return []
+    try:
+        arr = np.asarray(points, dtype=np.float64)
+    except (TypeError, ValueError):
+        return _chart_points_to_rows_slow(points)
+
+    arr = arr[np.isfinite(arr[:, 0])]
+    ts = arr[:, 0].astype(np.int64)
+    # ts may be in milliseconds
+    ts_ms = np.where(ts > 1e12, ts, ts * 1000)
+    dates = ts_ms.astype("datetime64[ms]").astype("datetime64[D]").astype(str).tolist()
+    # Missing values (null in the page) come through as NaN; report them as None
+    avgs = np.where(np.isnan(arr[:, 1]), None, arr[:, 1]).tolist()
+    peaks = np.where(np.isnan(arr[:, 2]), None, arr[:, 2]).tolist()
+    return [{"date": d, "avg": a, "peak": p} for d, a, p in zip(dates, avgs, peaks)]
+
+
 def fetch_monthly_series(appid: int) -> List[Dict]:
     """Fetch monthly series from SteamCharts.
 
@@ -52,7 +113,7 @@ def fetch_monthly_series(appid: int) -> List[Dict]:
     """
     url = f"https://steamcharts.com/app/{appid}"
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=12)
+        resp = _SESSION.get(url, timeout=12)
         resp.raise_for_status()
         text = resp.text
     except Exception as e:
@@ -64,28 +125,13 @@ def fetch_monthly_series(appid: int) -> List[Dict]:
     results = []
     if parsed:
         # parsed could be list of [ts, avg, peak]
-        for item in parsed:
-            if not isinstance(item, (list, tuple)) or len(item) < 3:
-                continue
-            try:
-                ts = int(item[0])
-                # ts may be in milliseconds
-                if ts > 1e12:
-                    # milliseconds
-                    dt = datetime.utcfromtimestamp(ts / 1000.0)
-                else:
-                    dt = datetime.utcfromtimestamp(ts)
-                avg = float(item[1]) if item[1] is not None else None
-                peak = float(item[2]) if item[2] is not None else None
-                results.append({"date": dt.strftime("%Y-%m-%d"), "avg": avg, "peak": peak})
-            except Exception:
-                continue
+        results = _chart_points_to_rows(parsed)
         if results:
             return results
 
     # Fallback: try to parse HTML table rows for monthly data
     try:
-        soup = BeautifulSoup(text, 'lxml')
+        soup = BeautifulSoup(text, 'lxml', parse_only=_TABLES)
         # Look for a table with class that suggests monthly data
         tables = soup.find_all('table')
         for table in tables:
@@ -102,11 +148,13 @@ def fetch_monthly_series(appid: int) -> List[Dict]:
                             # Attempt to parse month-year
                             try:
                                 dt = datetime.strptime(date_str.strip(), '%B %Y')
-                                date_key = dt.strftime('%Y-%m-01')
+                                date_key = f"{dt.year:04d}-{dt.month:02d}-01"
                             except Exception:
                                 date_key = date_str
-                            avg = float(cols[1].replace(',', '').replace('–', '0') or 0)
-                            peak = float(cols[2].replace(',', '').replace('–', '0') or 0)
+                            avg = float(cols[1].translate(_NUM_TABLE) or 0)
+                            # Peaks are whole player counts
+                            peak_str = cols[2].translate(_NUM_TABLE) or '0'
+                            peak = int(peak_str) if peak_str.isdigit() else float(peak_str)
                             results.append({"date": date_key, "avg": avg, "peak": peak})
                         except Exception:
                             continue
@@ -117,7 +165,7 @@ def fetch_monthly_series(appid: int) -> List[Dict]:
 
     # If still nothing, attempt to parse any JSON arrays in the page
     try:
-        json_arrays = re.findall(r"(\[\s*\[\s*\d+\s*,\s*\d+.*?\])", text, flags=re.S)
+        json_arrays = _RE_JSON_ARR.findall(text)
         for arr_text in json_arrays:
             try:
                 arr = json.loads(arr_text)
@@ -130,7 +178,7 @@ def fetch_monthly_series(appid: int) -> List[Dict]:
                             dt = datetime.utcfromtimestamp(ts)
                         avg = float(item[1])
                         peak = float(item[2])
-                        results.append({"date": dt.strftime('%Y-%m-%d'), "avg": avg, "peak": peak})
+                        results.append({"date": f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}", "avg": avg, "peak": peak})
                 if results:
                     return results
             except Exception:
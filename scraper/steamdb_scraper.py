@@ -2,11 +2,21 @@
 import time
 import random
 from typing import Optional
+import requests
 from bs4 import BeautifulSoup
-from .utils import create_session, RateLimiter
+from .utils import create_session, HOST_LIMITERS
 from .cache import SteamCache
 
 
+# Inline "Owners: 1,234" / "Peak players: 1,234" values in the raw page
+# (captures start with a digit, so "Owners, Followers" is a miss, not ",")
+_RE_OWNERS = re.compile(r"Owners[:\s]*(\d[\d,]*)")
+_RE_PEAK = re.compile(r"Peak\s*players[:\s]*(\d[\d,]*)", re.I)
+# Label text nodes for the DOM fallback
+_LABEL_OWNERS = re.compile(r"Owners|Owned", re.I)
+_LABEL_PEAK = re.compile(r"Peak\s*players", re.I)
+
+
 class SteamDBScraper:
     """More robust SteamDB scraper with stronger headers, randomized delays,
     backoff on 403 responses, and optional proxy support.
@@ -23,23 +33,28 @@ class SteamDBScraper:
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_6) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Safari/605.1.15",
     ]
 
-    def __init__(self, rate_limit_seconds: float = 1.0, proxies: Optional[dict] = None, max_403_retries: int = 3, cache: Optional[SteamCache] = None):
-        self.session = create_session()
-        self.rate_limiter = RateLimiter(rate_limit_seconds)
+    def __init__(self, rate_limit_seconds: float = 1.0, proxies: Optional[dict] = None, max_403_retries: int = 3, cache: Optional[SteamCache] = None, defer_writes: bool = False,
+                 session: Optional[requests.Session] = None, rate_limit_burst: int = 1):
+        # Pass a shared session to pool connections with other scrapers
+        self.session = session or create_session()
+        self.rate_limiter = HOST_LIMITERS.get(self.BASE_URL, rate_limit_seconds, rate_limit_burst)
         self.proxies = proxies
         self.max_403_retries = max_403_retries
         self.cache = cache or SteamCache()
+        # With defer_writes, results are buffered and written by flush_cache()
+        self.defer_writes = defer_writes
+        self._pending = []
 
-        # sensible default headers
-        self.session.headers.update({
+        # sensible default headers, sent per request so a shared session keeps its own
+        self.headers = {
             "User-Agent": random.choice(self.DEFAULT_USER_AGENTS),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.9",
             "Referer": "https://steamcommunity.com/",
             "Origin": "https://steamdb.info",
-        })
+        }
 
-    def _get_html(self, url: str) -> Optional[str]:
+    def _get_html(self, url: str, timeout: float = 15) -> Optional[str]:
         # Rate-limit
         self.rate_limiter.wait()
 
@@ -49,10 +64,10 @@ class SteamDBScraper:
             tries += 1
             # rotate UA occasionally
             if tries > 1:
-                self.session.headers["User-Agent"] = random.choice(self.DEFAULT_USER_AGENTS)
+                self.headers["User-Agent"] = random.choice(self.DEFAULT_USER_AGENTS)
 
             try:
-                resp = self.session.get(url, timeout=15, proxies=self.proxies)
+                resp = self.session.get(url, headers=self.headers, timeout=timeout, proxies=self.proxies)
                 if resp.status_code == 403:
                     # exponential backoff
                     time.sleep(backoff + random.random() * 0.5)
@@ -69,9 +84,9 @@ class SteamDBScraper:
                 continue
         return None
 
-    def _find_label_value(self, soup, label_regex: str):
+    def _find_label_value(self, soup, label_regex):
         # Find nodes with label text then read nearby text
-        pattern = re.compile(label_regex, re.I)
+        pattern = label_regex if isinstance(label_regex, re.Pattern) else re.compile(label_regex, re.I)
         for tag in soup.find_all(text=pattern):
             parent = tag.parent
             # look for sibling or next element text
@@ -85,33 +100,34 @@ class SteamDBScraper:
                     return nxt.get_text(strip=True)
         return None
 
-    def fetch_app(self, appid: int) -> Optional[dict]:
+    def get_cached(self, appid: int) -> Optional[dict]:
+        """Cached result for `appid`, or None without touching the network."""
+        return self.cache.get("steamdb_app", appid)
+
+    def fetch_app(self, appid: int, timeout: float = 15) -> Optional[dict]:
         # Check cache first
-        cached = self.cache.get("steamdb_app", appid)
+        cached = self.get_cached(appid)
         if cached is not None:
             return cached
         
         url = self.BASE_URL.format(appid=appid)
-        html = self._get_html(url)
+        html = self._get_html(url, timeout=timeout)
         if not html:
             return {"appid": appid, "steamdb_url": url, "owners": None, "peak_players": None, "raw_html_snippet": None}
 
-        soup = BeautifulSoup(html, "lxml")
+        # Cheap pass first: pull the values straight out of the raw HTML
+        m = _RE_OWNERS.search(html)
+        owners = m.group(1) if m else None
+        m = _RE_PEAK.search(html)
+        peak_players = m.group(1) if m else None
 
-        # Try to extract owners; SteamDB often shows owners estimates in textual form
-        owners = self._find_label_value(soup, r"Owners|Owned")
-        peak_players = self._find_label_value(soup, r"Peak\s*players")
-
-        # As a fallback, attempt regex search in raw HTML for patterns like 1,234,567
-        if not owners:
-            m = re.search(r"Owners[:\s]*([\d,]+)", html)
-            if m:
-                owners = m.group(1)
-
-        if not peak_players:
-            m = re.search(r"Peak players[:\s]*([\d,]+)", html)
-            if m:
-                peak_players = m.group(1)
+        # Only build the DOM when a value is still missing
+        if not owners or not peak_players:
+            soup = BeautifulSoup(html, "lxml")
+            if not owners:
+                owners = self._find_label_value(soup, _LABEL_OWNERS)
+            if not peak_players:
+                peak_players = self._find_label_value(soup, _LABEL_PEAK)
 
         result = {
             "appid": appid,
@@ -122,5 +138,13 @@ class SteamDBScraper:
         }
         # Cache the result
         if result:
-            self.cache.set("steamdb_app", appid, result)
+            if self.defer_writes:
+                self._pending.append(("steamdb_app", appid, result))
+            else:
+                self.cache.set("steamdb_app", appid, result)
         return result
+
+    def flush_cache(self) -> int:
+        """Write buffered results to the cache in a single transaction."""
+        pending, self._pending = self._pending, []
+        return self.cache.set_many(pending)
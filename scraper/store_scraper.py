@@ -1,6 +1,9 @@
 import json
 from typing import Optional
-from .utils import create_session, RateLimiter, safe_get
+
+import requests
+
+from .utils import create_session, HOST_LIMITERS, safe_get
 from .cache import SteamCache
 
 
@@ -13,10 +16,17 @@ class SteamStoreScraper:
 
     API_URL = "https://store.steampowered.com/api/appdetails"
 
-    def __init__(self, rate_limit_seconds: float = 0.5, cache: Optional[SteamCache] = None):
-        self.session = create_session()
-        self.rate_limiter = RateLimiter(rate_limit_seconds)
+    def __init__(self, rate_limit_seconds: float = 0.5, cache: Optional[SteamCache] = None, defer_writes: bool = False,
+                 session: Optional[requests.Session] = None, rate_limit_burst: int = 4):
+        # Pass a shared session to pool connections with other scrapers
+        self.session = session or create_session()
+        # A few requests may go out back to back after an idle spell; the average
+        # rate stays one per rate_limit_seconds
+        self.rate_limiter = HOST_LIMITERS.get(self.API_URL, rate_limit_seconds, rate_limit_burst)
         self.cache = cache or SteamCache()
+        # With defer_writes, results are buffered and written by flush_cache()
+        self.defer_writes = defer_writes
+        self._pending = []
 
     def fetch_app(self, appid: int) -> Optional[dict]:
         # Check cache first
@@ -26,7 +36,7 @@ class SteamStoreScraper:
         
         params = {"appids": str(appid), "l": "english"}
         resp = safe_get(self.session, self.API_URL, rate_limiter=self.rate_limiter, params=params, timeout=15)
-        data = resp.json()
+        data = json.loads(resp.content)
         if not data or str(appid) not in data or not data[str(appid)].get("success"):
             return None
         raw = data[str(appid)].get("data", {})
@@ -52,5 +62,13 @@ class SteamStoreScraper:
         }
         # Cache the result
         if result:
-            self.cache.set("store_appdetails", appid, result)
+            if self.defer_writes:
+                self._pending.append(("store_appdetails", appid, result))
+            else:
+                self.cache.set("store_appdetails", appid, result)
         return result
+
+    def flush_cache(self) -> int:
+        """Write buffered results to the cache in a single transaction."""
+        pending, self._pending = self._pending, []
+        return self.cache.set_many(pending)
@@ -0,0 +1,317 @@
+"""Shared pipeline behind the top-N scripts (`top100_scraper.py`, `top100_topsellers_scraper.py`).
+
+Each script only knows how to list its apps from a Store search page; everything
+after that lives here: fetching store metadata, news, current players and SteamDB
+data for every app on one thread pool, and writing the JSON/NDJSON and CSV outputs.
+"""
+import csv
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import lxml.html
+import requests
+from lxml import etree
+
+from .cache import SteamCache
+from .steam_api import fetch_current_players, fetch_news_for_app
+from .steamdb_scraper import SteamDBScraper
+from .store_scraper import SteamStoreScraper
+from .utils import create_session, read_api_key, worker_pool
+
+
+SEARCH_URL = "https://store.steampowered.com/search/"
+# Title span of a search result row (class lists may hold several names),
+# compiled once instead of re-parsing the expression on every row
+_ROW_CLASS = "search_result_row"
+_TITLE_XPATH = etree.XPath('.//span[contains(concat(" ", normalize-space(@class), " "), " title ")]')
+MAX_WORKERS = 32  # Concurrent fetches (up to 4 per app); store/SteamDB stay behind their rate limiters
+STEAMDB_IDLE_TIMEOUT = 6  # SteamDB timeout for apps with zero current players
+CSV_HEADER = ["appid", "name", "current_players", "store_name", "owners_estimate", "news_count"]
+NEWS_SUMMARY_FIELDS = ("gid", "title", "url", "date")  # kept per news item when news_detail=False
+# Hosts to connect to while the search page loads (the search request warms the Store itself)
+WARM_URLS = ("https://api.steampowered.com/",)
+
+# One keep-alive pool for the whole run: Store search and appdetails, SteamDB,
+# news and player counts all reuse its per-host connections
+_SESSION = create_session(status_forcelist=(429, 500, 502, 503, 504), pool_connections=4, pool_maxsize=32)
+
+
+@dataclass(slots=True)
+class Entry:
+    """Collected data for one app; attribute reads keep the CSV pass off dict lookups."""
+    appid: int
+    name: Optional[str]
+    collected_at: str
+    store: Optional[dict] = None
+    steamdb: Optional[dict] = None
+    news: Optional[list] = None
+    current_players: Optional[int] = None
+    store_error: Optional[str] = None
+    steamdb_error: Optional[str] = None
+    news_error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """JSON record for this entry; `*_error` keys only appear when that fetch failed."""
+        d = {"appid": self.appid, "name": self.name, "collected_at": self.collected_at, "store": self.store}
+        if self.store_error is not None:
+            d["store_error"] = self.store_error
+        d["steamdb"] = self.steamdb
+        if self.steamdb_error is not None:
+            d["steamdb_error"] = self.steamdb_error
+        d["news"] = self.news
+        if self.news_error is not None:
+            d["news_error"] = self.news_error
+        d["current_players"] = self.current_players
+        return d
+
+
+def _appid_from_href(href: str) -> Optional[int]:
+    """Appid from a Store link like `.../app/570/Dota_2/`, or None."""
+    _, sep, rest = href.partition("/app/")
+    aid_str, slash, _ = rest.partition("/")
+    if not (sep and slash and aid_str.isascii() and aid_str.isdigit()):
+        return None
+    return int(aid_str)
+
+
+def _warm_connections(urls: Iterable[str]) -> None:
+    """Pay DNS, TCP and TLS setup for each host up front, leaving the connection in the pool."""
+    for url in urls:
+        try:
+            _SESSION.head(url, timeout=3)
+        except requests.RequestException:
+            pass  # best effort; the real requests will connect on their own
+
+
+def _iter_search_rows(resp: requests.Response) -> Iterator[lxml.html.HtmlElement]:
+    """Result-row anchors of a streamed Store search page, yielded as the body arrives.
+
+    Each anchor is complete when yielded. A caller that stops early leaves the
+    rest of the page unread and unparsed.
+    """
+    # Decode with the HTTP charset. Without one, use UTF-8 rather than requests'
+    # ISO-8859-1 default for text/*, which would garble names like "Counter-Strike™"
+    has_charset = "charset" in resp.headers.get("Content-Type", "").lower()
+    encoding = resp.encoding if has_charset and resp.encoding else "utf-8"
+    parser = etree.HTMLPullParser(events=("end",), tag="a", encoding=encoding)
+    parser.set_element_class_lookup(lxml.html.HtmlElementClassLookup())
+    for chunk in resp.iter_content(chunk_size=8192):
+        parser.feed(chunk)
+        for _, el in parser.read_events():
+            if _ROW_CLASS in (el.get("class") or "").split():
+                yield el
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        return  # empty body
+    for _, el in parser.read_events():
+        if _ROW_CLASS in (el.get("class") or "").split():
+            yield el
+
+
+def fetch_search_page(params: dict, n: int, results: List[dict], headers: Optional[dict] = None) -> int:
+    """Append apps from one Store search page to `results` until it holds `n`.
+
+    The page is streamed and reading stops once `n` is reached. Returns the
+    number of result rows seen, so 0 means the listing has run out.
+    """
+    page_rows = 0
+    with _SESSION.get(SEARCH_URL, params=params, timeout=15, stream=True, headers=headers) as resp:
+        resp.raise_for_status()
+        for row in _iter_search_rows(resp):
+            page_rows += 1
+            if len(results) >= n:
+                break
+
+            # Extract appid from href like /app/570/
+            appid = _appid_from_href(row.get("href", ""))
+            if appid is None:
+                continue
+
+            # Extract game name from title or text
+            title_elems = _TITLE_XPATH(row)
+            name = title_elems[0].text_content().strip() if title_elems else f"App {appid}"
+
+            results.append({"appid": appid, "name": name})
+    return page_rows
+
+
+def _fetch_news_summary(aid: int, api_key: Optional[str], cache: Optional[SteamCache] = None) -> List[dict]:
+    """Headline fields of an app's news; bodies are truncated by the API and then dropped."""
+    items = fetch_news_for_app(aid, api_key=api_key, count=10, maxlength=1, cache=cache, session=_SESSION)
+    return [{k: it.get(k) for k in NEWS_SUMMARY_FIELDS} for it in items]
+
+
+def _submit_app(ex: ThreadPoolExecutor, item: dict, store: SteamStoreScraper, api_key: Optional[str],
+                cache: Optional[SteamCache] = None, news_detail: bool = True) -> Dict[str, Future]:
+    """Queue the store, news and player-count fetches for one app; SteamDB is queued separately."""
+    aid = item["appid"]
+    if news_detail:
+        news = ex.submit(fetch_news_for_app, aid, api_key=api_key, count=10, cache=cache, session=_SESSION)
+    else:
+        news = ex.submit(_fetch_news_summary, aid, api_key, cache)
+    return {
+        "store": ex.submit(store.fetch_app, aid),
+        "news": news,
+        "players": ex.submit(fetch_current_players, aid, session=_SESSION, cache=cache),
+    }
+
+
+def _fetch_steamdb(steamdb: SteamDBScraper, aid: int, players: Future) -> Optional[dict]:
+    # A cached page costs nothing, whatever the player probe says
+    cached = steamdb.get_cached(aid)
+    if cached is not None:
+        return cached
+    # Cheap player-count probe before going to the network: no count means the
+    # app is delisted or unknown to the API, so don't spend SteamDB's 403
+    # backoff budget on it
+    pc = players.result()
+    if pc is None:
+        return None
+    # Nobody playing right now: don't wait as long on a slow page
+    return steamdb.fetch_app(aid, timeout=15 if pc else STEAMDB_IDLE_TIMEOUT)
+
+
+def _assemble_entry(item: dict, futures: Dict[str, Future], collected_at: str) -> Entry:
+    """Build the entry for one app, popping each future so its result is freed once written."""
+    aid = item["appid"]
+    print(f"Processing {aid} - {item.get('name')}")
+    entry = Entry(aid, item.get("name"), collected_at)
+
+    # store metadata
+    try:
+        entry.store = futures.pop("store").result()
+    except Exception as e:
+        entry.store_error = str(e)
+
+    # steamdb best-effort
+    try:
+        entry.steamdb = futures.pop("steamdb").result()
+    except Exception as e:
+        entry.steamdb_error = str(e)
+
+    # news
+    try:
+        entry.news = futures.pop("news").result()
+    except Exception as e:
+        entry.news_error = str(e)
+
+    # current players
+    entry.current_players = futures.pop("players").result()
+
+    return entry
+
+
+class _JsonArrayWriter:
+    """Streams dicts into `f` as the text `json.dumps(items, indent=2)` would produce."""
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+        f.write("[")
+
+    def write(self, obj: dict) -> None:
+        # Entries sit one level deep, so every line of the dump shifts right by two
+        text = json.dumps(obj, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self.f.write(("\n  " if self.count == 0 else ",\n  ") + text)
+        self.count += 1
+
+    def close(self) -> None:
+        self.f.write("\n]" if self.count else "]")
+
+
+def _iter_rows(entries: Iterable[Entry], on_entry: Callable[[Entry], None]) -> Iterator[tuple]:
+    """CSV summary rows for `entries`, handing each entry to `on_entry` before its row."""
+    for r in entries:
+        on_entry(r)
+        s = r.store or {}
+        sdb = r.steamdb or {}
+        yield (r.appid, r.name, r.current_players, s.get("name"), sdb.get("owners"), len(r.news or ()))
+
+
+def collect_top_apps(fetch_list: Callable[[], List[dict]], label: str, out_json: str, out_csv: str,
+                     use_cache: bool = True, max_workers: int = MAX_WORKERS, news_detail: bool = True):
+    """Fetch the apps listed by `fetch_list` and write them to `out_json` and `out_csv`.
+
+    `fetch_list` returns `{"appid", "name"}` dicts in ranking order; `label`
+    describes them in the progress output. An `out_json` ending in `.jsonl` gets
+    one JSON object per line, anything else a single indented JSON array.
+
+    The CSV only needs a news count. With `news_detail=False` the news API is
+    asked for 1-char bodies and each item keeps just its gid, title, url and date:
+    downloads and the JSON output shrink by roughly an order of magnitude, but
+    the article text is not saved.
+    """
+    api_key = read_api_key()
+    print(f"Using API key: {'present' if api_key else 'none'}")
+
+    cache = SteamCache() if use_cache else None
+    if cache:
+        stats = cache.get_stats()
+        print(f"Cache: {stats['total']} entries")
+
+    # Open the Web API connection in the background while the search page downloads
+    threading.Thread(target=_warm_connections, args=(WARM_URLS,), daemon=True).start()
+    tops = fetch_list()
+    print(f"Found {len(tops)} {label}")
+
+    # Buffer cache writes and commit them in one transaction at the end
+    store = SteamStoreScraper(cache=cache, defer_writes=True, session=_SESSION)
+    steamdb = SteamDBScraper(cache=cache, defer_writes=True, session=_SESSION)
+
+    ndjson = out_json.endswith(".jsonl")
+    # One collection timestamp for the whole run (UTC, second precision)
+    collected_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    # Write to temporary files and swap them in only after a complete run, so an
+    # interrupted or failed run leaves the previous results untouched
+    tmp_json, tmp_csv = out_json + ".tmp", out_csv + ".tmp"
+    try:
+        with open(tmp_json, "w", encoding="utf-8") as fj, \
+                open(tmp_csv, "w", encoding="utf-8", newline="", buffering=1 << 20) as fc:
+            if ndjson:
+                on_entry = lambda entry: fj.write(json.dumps(entry.to_dict(), ensure_ascii=False) + "\n")
+            else:
+                array = _JsonArrayWriter(fj)
+                on_entry = lambda entry: array.write(entry.to_dict())
+            writer = csv.writer(fc)
+            writer.writerow(CSV_HEADER)
+            try:
+                # On Ctrl-C or an error, queued fetches are cancelled and buffered results still flushed
+                with worker_pool(max(1, min(max_workers, 4 * len(tops)))) as ex:
+                    # Store, news and player-count calls for every app are independent
+                    # and go straight onto the pool. Scrapers share their rate limiters
+                    # across workers.
+                    jobs = []
+                    for item in tops:
+                        jobs.append((item, _submit_app(ex, item, store, api_key, cache, news_detail)))
+                    # Each SteamDB task blocks on its own app's player probe. The pool
+                    # starts tasks in submission order, so queueing these after every
+                    # probe means a probe is always running or done before anything
+                    # waits on it, and the waits cannot starve the pool.
+                    for item, futures in jobs:
+                        futures["steamdb"] = ex.submit(_fetch_steamdb, steamdb, item["appid"], futures["players"])
+                    # Entries are assembled in ranking order and each one goes to the
+                    # JSON and CSV outputs in the same pass, so nothing accumulates.
+                    entries = (_assemble_entry(item, futures, collected_at) for item, futures in jobs)
+                    writer.writerows(_iter_rows(entries, on_entry))
+            finally:
+                store.flush_cache()
+                steamdb.flush_cache()
+            if not ndjson:
+                array.close()
+    except BaseException:
+        for path in (tmp_json, tmp_csv):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise
+    os.replace(tmp_json, out_json)
+    os.replace(tmp_csv, out_csv)
+
+    print(f"Wrote {len(tops)} entries to {out_json} and {out_csv}")
@@ -1,13 +1,23 @@
+import threading
 import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import numpy as np
 import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
 
-def create_session(retries: int = 3, backoff_factor: float = 0.3, status_forcelist=(500, 502, 504)):
+def create_session(retries: int = 3, backoff_factor: float = 0.3, status_forcelist=(500, 502, 504),
+                   pool_connections: int = 10, pool_maxsize: int = 10):
     session = requests.Session()
     retry = Retry(total=retries, read=retries, connect=retries, backoff_factor=backoff_factor, status_forcelist=status_forcelist)
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     session.headers.update({"User-Agent": "steam-scraper/1.0 (+https://github.com/)"})
@@ -15,16 +25,69 @@ def create_session(retries: int = 3, backoff_factor: float = 0.3, status_forceli
 
 
 class RateLimiter:
-    def __init__(self, min_interval_seconds: float = 1.0):
+    """Thread-safe token bucket: `burst` calls may go back to back, then one per interval.
+
+    Tokens refill at one per `min_interval_seconds` up to `burst`, so a limiter that
+    has been idle lets a short burst through without sleeping. Each caller reserves a
+    token under the lock and sleeps outside it, so concurrent workers queue up at the
+    configured rate instead of blocking each other.
+    """
+
+    def __init__(self, min_interval_seconds: float = 1.0, burst: int = 1):
         self.min_interval = min_interval_seconds
-        self._last_call = 0.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def tighten(self, min_interval_seconds: float, burst: int = 1):
+        """Adopt the stricter of the current and the given settings."""
+        with self._lock:
+            self.min_interval = max(self.min_interval, min_interval_seconds)
+            self.burst = min(self.burst, max(1, burst))
+            self._tokens = min(self._tokens, float(self.burst))
 
     def wait(self):
-        now = time.time()
-        elapsed = now - self._last_call
-        if elapsed < self.min_interval:
-            time.sleep(self.min_interval - elapsed)
-        self._last_call = time.time()
+        with self._lock:
+            if self.min_interval <= 0:
+                return
+            rate = 1.0 / self.min_interval
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * rate)
+            self._last_refill = now
+            self._tokens -= 1.0
+            # Negative balance means this call is queued behind earlier reservations
+            delay = -self._tokens / rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+
+
+class HostRateLimiter:
+    """One `RateLimiter` per hostname, so every client of a host shares its budget."""
+
+    def __init__(self):
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, min_interval_seconds: float = 1.0, burst: int = 1) -> RateLimiter:
+        """Limiter for the host of `url`.
+
+        Clients of one host share a limiter; when they ask for different settings
+        it keeps the stricter ones (longest interval, smallest burst), so no
+        client ends up paced faster than it asked for.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = RateLimiter(min_interval_seconds, burst)
+            else:
+                limiter.tighten(min_interval_seconds, burst)
+            return limiter
+
+
+# Process-wide registry used by the scrapers
+HOST_LIMITERS = HostRateLimiter()
 
 
 def safe_get(session: requests.Session, url: str, rate_limiter: RateLimiter = None, **kwargs):
@@ -33,3 +96,78 @@ def safe_get(session: requests.Session, url: str, rate_limiter: RateLimiter = No
     resp = session.get(url, **kwargs)
     resp.raise_for_status()
     return resp
+
+
+@contextmanager
+def worker_pool(max_workers: int) -> Iterator[ThreadPoolExecutor]:
+    """Thread pool that drops its queued tasks when the body raises or is interrupted.
+
+    A plain `with ThreadPoolExecutor()` waits for every submitted task on the way
+    out, so Ctrl-C would only take effect once the whole backlog had run. Here,
+    tasks that have not started are cancelled and the exception propagates at once;
+    tasks already running finish in the background.
+    """
+    ex = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        yield ex
+    except BaseException:
+        ex.shutdown(wait=False, cancel_futures=True)
+        raise
+    ex.shutdown(wait=True)
+
+
+def dedupe_appids(appids: Iterable[int]) -> List[int]:
+    """Drop duplicate appids, keeping the first occurrence order.
+
+    Works on an int64 array (sort-based unique) rather than hashing Python ints,
+    which matters for id files with tens of thousands of entries.
+    """
+    arr = np.asarray(list(appids), dtype=np.int64)
+    if arr.size == 0:
+        return []
+    _, first_idx = np.unique(arr, return_index=True)
+    return arr[np.sort(first_idx)].tolist()
+
+
+def read_appids_from_file(path: str) -> List[int]:
+    """Read appids from a file with one id per line.
+
+    Parsed in C via `np.loadtxt` when every non-blank line is a single integer;
+    anything else (several fields on a line, comments, non-numeric text) falls back
+    to a line-by-line parse that skips lines which aren't an integer.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # empty file -> "input contained no data"
+            arr = np.loadtxt(path, dtype=np.int64, comments=None, ndmin=2, encoding="utf-8")
+        # One column only: "570 730" on a line is not an id, same as int() would say
+        if arr.shape[1] == 1:
+            return arr[:, 0].tolist()
+    except ValueError:
+        pass
+
+    ids = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            s = line.strip()
+            if not s:
+                continue
+            try:
+                ids.append(int(s))
+            except ValueError:
+                continue
+    return ids
+
+
+@lru_cache(maxsize=8)
+def read_api_key(path: str = "APIkey.txt") -> Optional[str]:
+    """Read Steam API key from file if it exists.
+
+    Cached per path: the key file does not change during a run.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            key = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return key or None